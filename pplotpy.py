@@ -12,6 +12,7 @@ import sys
 from argparse import ArgumentParser, RawTextHelpFormatter
 from pplotpy.quantiles import Quantiles 
 from pplotpy.distributions import SupportedDistributions 
+from pplotpy.samples import SampleFormats
 
 
 epilog = \
@@ -43,7 +44,29 @@ parser.add_argument('-i',
                     dest='samplesFile',
                     action='store',
                     default=None,
-                    help='specify the *.csv file containing the samples')
+                    help='specify the file containing the samples; supported extensions:\n'
+                         + ', '.join(sorted(SampleFormats.extensions.keys())))
+
+parser.add_argument('--format',
+                    dest='SamplesFormat',
+                    action='store',
+                    choices=list(SampleFormats.subclasses.keys()),
+                    default=None,
+                    help='specify the samples file format (default: from extension)')
+
+parser.add_argument('--column',
+                    dest='SamplesColumn',
+                    action='store',
+                    default=None,
+                    help='specify the column to read from *.npy/Arrow samples files')
+
+parser.add_argument('--chunk-size',
+                    dest='ChunkSize',
+                    action='store',
+                    type=int,
+                    default=None,
+                    help='sort samples out-of-core in chunks of this many values\n'
+                         '(not with --subsample, which does not sort)')
 
 parser.add_argument('-d',
                     dest='Distribution',
@@ -66,6 +89,34 @@ parser.add_argument('--loc',
                     default=0.0,
                     help='specify value of the location parameter; only valid for some distributions')
 
+parser.add_argument('--band',
+                    dest='BandLevel',
+                    action='store',
+                    type=float,
+                    default=None,
+                    help='draw a simultaneous confidence band of this level (e.g. 0.95)\n'
+                         'on the probability plot')
+
+parser.add_argument('--subsample',
+                    dest='Subsample',
+                    action='store',
+                    type=int,
+                    default=None,
+                    help='fit on about this many order statistics (both tails included),\n'
+                         'selected without a full sort of the samples')
+
+parser.add_argument('--subsample-error',
+                    dest='subsampleErrorBool',
+                    action='store_true',
+                    default=False,
+                    help='with --subsample, also report the difference from a full fit')
+
+parser.add_argument('--lmoments',
+                    dest='lmomentsBool',
+                    action='store_true',
+                    default=False,
+                    help='also report parameter estimates from the sample L-moments')
+
 parser.add_argument('--plot',
                     dest='plotBool',
                     action='store_true',
@@ -97,14 +148,36 @@ if __name__ == "__main__":
             if not os.path.exists(path):   # File must exist
                 print("Error: specified file does not exist")
                 sys.exit()
-            elif not path.endswith('csv'): # Must be a *.csv
-                print("Error: samples file must be in *.csv format")
+            elif options.SamplesFormat == None and \
+                    os.path.splitext(path)[1].lower() not in SampleFormats.extensions:
+                print("Error: samples file must be one of these formats: %s"
+                      % ', '.join(sorted(SampleFormats.extensions.keys())))
+                sys.exit()
+            elif options.ChunkSize != None and options.Subsample != None:
+                # Subsampling selects order statistics without sorting
+                print("Error: '--chunk-size' cannot be used with '--subsample'")
                 sys.exit()
             else:
-                import numpy as np
-                samples_tmp = np.loadtxt(path, delimiter=',')
-                samples = samples_tmp.flatten()
-                dist_obj.feed_samples(samples)
+                from pplotpy.samples import load_sorted_samples
+                from pplotpy.samples import load_samples
+                try:
+                    if options.Subsample == None:
+                        samples = load_sorted_samples(
+                            path,
+                            fmt=options.SamplesFormat,
+                            column=options.SamplesColumn,
+                            chunk_size=options.ChunkSize)
+                    else:
+                        samples = load_samples(path,
+                                               fmt=options.SamplesFormat,
+                                               column=options.SamplesColumn)
+                except ValueError as error:
+                    print("Error: %s" % error)
+                    sys.exit()
+                if options.Subsample == None:
+                    dist_obj.feed_samples(samples, presorted=True)
+                else:
+                    dist_obj.feed_samples(samples, subsample=options.Subsample)
 
         # Quantiles
         dist_obj.calc_quantiles(options.QuantileMethod)
@@ -126,6 +199,25 @@ if __name__ == "__main__":
             print("%8s%-10s%s"  % ('',"Location:", dist_obj.get_loc_str()))
         print("%8s%-10s%s"  % ('',"R^2:", dist_obj.get_coeff_of_determ_str()),
               end="\n\n")
+        if options.lmomentsBool == True:
+            dist_obj.calc_lmoments()
+            shape_str, loc_str, scale_str = dist_obj.get_lmoment_strs()
+            print("%4sL-moment estimates:" % "")
+            if dist_obj.has_shape == True:
+                print("%8s%-10s%s" % ('',"Shape:", shape_str))
+            if dist_obj.has_scale == True:
+                print("%8s%-10s%s" % ('',"Scale:", scale_str))
+            if dist_obj.has_loc == True:
+                print("%8s%-10s%s"  % ('',"Location:", loc_str))
+            print()
+        if options.Subsample != None and options.subsampleErrorBool == True:
+            errors = dist_obj.calc_subsample_error(samples,
+                                                   options.QuantileMethod)
+            print("%4sDifference from full fit (%d of %d samples):"
+                  % ("", len(dist_obj.samples), dist_obj.nsamples))
+            for name, error in errors.items():
+                print("%8s%-10s%s" % ('', name + ":", error))
+            print()
         
         # Plot
         if options.plotBool == True:
@@ -133,7 +225,7 @@ if __name__ == "__main__":
             plt.close('all')
             fig = plt.figure()
             axes = fig.add_subplot(111)
-            dist_obj.create_pplot(axes)
+            dist_obj.create_pplot(axes, band_level=options.BandLevel)
             plt.show()
         
     # GUI Option
@@ -0,0 +1,179 @@
+###############################################################################
+#
+#    pplotpy - a probability plotting tool for Python
+#
+#    Copyright (C) 2017,  Nicholas A. Reynolds
+#
+#    Full License Available in LICENSE file at
+#    https://github.com/nicholasareynolds/pplotpy
+#
+###############################################################################
+
+import threading
+
+import numpy as np
+from scipy.special import betainc, betaincinv
+
+from . import quantiles
+from .samples import stratified_ranks
+
+
+class ConfidenceBands():
+    """
+    Cached tables of simultaneous confidence bands for probability plots.
+
+    The i-th of n order statistics of a uniform sample follows the beta
+    distribution Beta(i, n - i + 1), so each rank has a pointwise band
+    [beta ppf(a/2), beta ppf(1 - a/2)].  The pointwise level 'a' is calibrated
+    by simulation so that all n ranks fall within their bands simultaneously
+    with the requested confidence (the "tail-sensitive" band of Aldor-Noiman
+    et al., 2013).  The returned tables hold only up to 'max_points' of the
+    ranks (both tails in full), which is all that is needed for rendering.
+
+    A table depends only on n, the quantile method (which places the band
+    centers) and the confidence level, and is computed once per combination.
+    """
+
+    # Aldor-Noiman, S., Brown, L. D., Buja, A., Rolke, W., Stine, R. A.
+    #  (2013), The Power to See: A New Graphical Test of Normality, The
+    #  American Statistician, 67(4), pp. 249-260.
+
+    num_sims = 1000    # Simulated samples used to calibrate the level
+    max_points = 500   # Ranks tabulated per band
+    seed = 20170101    # Fixed, so tables are reproducible
+
+    _tables = {}
+    _lock = threading.Lock()
+
+
+    @classmethod
+    def get_table(cls, n, qmethod, level=0.95):
+        """
+        Return (ranks, centers, lower, upper) probability arrays for a band.
+
+        'ranks' are the 0-based tabulated ranks; 'centers' their quantiles
+        from 'qmethod'; 'lower'/'upper' the band limits in probability.
+        """
+
+        key = (int(n), qmethod, float(level), cls.max_points, cls.num_sims)
+        with cls._lock:
+            table = cls._tables.get(key)
+        if table is None:
+            table = cls._calc_table(n, qmethod, level)
+            with cls._lock:
+                cls._tables.setdefault(key, table)
+        return table
+
+
+    @classmethod
+    def clear(cls):
+        """Discard all cached tables"""
+
+        with cls._lock:
+            cls._tables.clear()
+
+
+    @classmethod
+    def _calc_table(cls, n, qmethod, level):
+        """Compute a band table (vectorized over ranks and simulations)"""
+
+        ranks = stratified_ranks(n, cls.max_points)
+        a = ranks + 1.0
+        b = n - ranks
+        alpha = cls._calibrate(n, ranks, level)
+        lower = betaincinv(a, b, 0.5 * alpha)
+        upper = betaincinv(a, b, 1.0 - 0.5 * alpha)
+        centers = quantiles.Quantiles.create_subclass_instance(qmethod)() \
+            .get_quantiles_at(n, ranks)
+        table = (ranks, np.asarray(centers, dtype=float), lower, upper)
+        for array in table:
+            array.setflags(write=False)
+        return table
+
+
+    @classmethod
+    def _calibrate(cls, n, ranks, level):
+        """Return the pointwise level giving 'level' simultaneous coverage"""
+
+        # Uniform order statistics at the tabulated ranks, from the partial
+        # sums of exponential spacings: U_(i) = S_i / S_(n+1).
+        rng = np.random.default_rng(cls.seed)
+        gaps = np.diff(np.concatenate(([0.0], ranks + 1.0, [n + 1.0])))
+        sums = np.cumsum(rng.gamma(gaps, size=(cls.num_sims, gaps.size)),
+                         axis=1)
+        uniforms = sums[:, :-1] / sums[:, -1:]
+
+        # Smallest two-sided pointwise tail probability in each simulation
+        min_tail = np.min(_two_sided_tail(n, ranks, uniforms), axis=1)
+
+        # The ranks between two tabulated ones must be covered too.  For
+        # lo < i < hi, U_(lo) <= U_(i) <= U_(hi) and the beta cdf F_i falls
+        # with i, so the tail of rank i is at least
+        #     2 min(F_hi(U_(lo)), 1 - F_lo(U_(hi))).
+        # Only intervals where this bound is below the smallest tail found
+        # so far can lower it; they are bisected, simulating the midpoint
+        # given its ends, U_(lo) + (U_(hi) - U_(lo)) Beta(mid - lo, hi - mid).
+        #
+        # Of the minima, only the smallest up to the one read by np.quantile
+        # must be exact, so intervals bounded above the current value of that
+        # one (the cutoff) are not refined either; the result is the same as
+        # refining all.  Against the cutoff, the bound is tested in terms of
+        # the uniforms, with limits computed once per rank rather than once
+        # per simulation.
+        last = int(np.ceil((cls.num_sims - 1) * (1.0 - level)))
+        num_gaps = ranks.size - 1
+        sim = np.repeat(np.arange(cls.num_sims), num_gaps)
+        lo = np.tile(ranks[:-1], cls.num_sims)
+        hi = np.tile(ranks[1:], cls.num_sims)
+        u_lo = uniforms[:, :-1].ravel()
+        u_hi = uniforms[:, 1:].ravel()
+        while sim.size:
+            cutoff = np.partition(min_tail, last)[last]
+            below, _ = _tail_limits(n, hi, cutoff)
+            _, above = _tail_limits(n, lo, cutoff)
+            refine = (hi - lo > 1) & ((u_lo < below) | (u_hi > above))
+
+            # Simulations already below the cutoff: test their own minimum
+            own = np.flatnonzero(refine & (min_tail[sim] < cutoff))
+            bound = 2.0 * np.minimum(
+                betainc(hi[own] + 1.0, n - hi[own], u_lo[own]),
+                1.0 - betainc(lo[own] + 1.0, n - lo[own], u_hi[own]))
+            refine[own] = bound < min_tail[sim[own]]
+
+            sim, lo, hi = sim[refine], lo[refine], hi[refine]
+            u_lo, u_hi = u_lo[refine], u_hi[refine]
+            mid = (lo + hi) // 2
+            u_mid = u_lo + (u_hi - u_lo) * rng.beta(mid - lo, hi - mid)
+
+            # Tails at the midpoints only matter below the cutoff
+            below, above = _tail_limits(n, mid, cutoff)
+            near = (u_mid < below) | (u_mid > above)
+            np.minimum.at(min_tail, sim[near],
+                          _two_sided_tail(n, mid[near], u_mid[near]))
+
+            sim = np.concatenate((sim, sim))
+            lo, hi = np.concatenate((lo, mid)), np.concatenate((mid, hi))
+            u_lo = np.concatenate((u_lo, u_mid))
+            u_hi = np.concatenate((u_mid, u_hi))
+        return np.quantile(min_tail, 1.0 - level)
+
+
+def _two_sided_tail(n, ranks, uniforms):
+    """Two-sided beta tail probability of 'uniforms' at 0-based 'ranks'"""
+
+    cdf = betainc(ranks + 1.0, n - ranks, uniforms)
+    return 2.0 * np.minimum(cdf, 1.0 - cdf)
+
+
+def _tail_limits(n, ranks, tail):
+    """
+    Return the uniforms below and above which the two-sided tail probability
+    at each of 'ranks' is less than 'tail'.
+    """
+
+    # Evaluated once per distinct rank; the ranks repeat across simulations
+    unique, index = np.unique(ranks, return_inverse=True)
+    a = unique + 1.0
+    b = n - unique
+    return betaincinv(a, b, 0.5 * tail)[index], \
+        betaincinv(a, b, 1.0 - 0.5 * tail)[index]
@@ -9,8 +9,9 @@
 #
 ###############################################################################
 
-from scipy import stats
-from scipy.special import erfinv
+from collections import namedtuple
+
+from scipy.special import erfinv, gamma
 from . import quantiles
 
 import numpy as np
@@ -25,10 +26,11 @@ class CandidateDistributions:
     quantile calculation method are changed.
     """
     
-    def __init__(self):
+    def __init__(self, subsample=None):
         """initialize the emtpy list for 'dists'"""
 
         self.dists = list()
+        self.subsample = subsample  # Number of order statistics, or None
 
         
     def add_distribution(self, dist_obj, samples, qmethod_str):
@@ -41,15 +43,49 @@ class CandidateDistributions:
     def _calc_results(self, dist_obj, samples, qmethod_str):
         """Store samples; calc. quantiles, perform regression for dist_obj."""
 
-        dist_obj.feed_samples(samples)
+        dist_obj.feed_samples(samples, subsample=self.subsample)
         dist_obj.calc_quantiles(qmethod_str)
         dist_obj.eval_data()
 
 
     def calc_all(self, samples, qmethod_str):
         """Perform prob. plot calcs for all distributions in self.dists."""
+
+        # Sort (or select from) the samples once for all of the candidates
+        from .parallel import prepare_samples
+        prepared = prepare_samples(samples, self.subsample)
         for dist_obj in self.dists:
-            self._calc_results(dist_obj, samples, qmethod_str)
+            dist_obj.feed_samples(prepared,
+                                  presorted=True,
+                                  subsample=self.subsample)
+            dist_obj.calc_quantiles(qmethod_str)
+            dist_obj.eval_data()
+
+
+    def calc_all_async(self, samples, qmethod_str, executor=None,
+                       max_workers=None, processes=False, deadline=None):
+        """
+        Start prob. plot calcs for all distributions in self.dists concurrently.
+
+        Returns a parallel.CandidateFits; iterate over its as_completed() for
+        each (dist_obj, error) as it finishes, or call its cancel().  The fits
+        run on 'executor', or on a new thread (process, if 'processes') pool
+        of 'max_workers'.  'deadline' limits each fit to that many seconds.
+        """
+
+        from .parallel import CandidateFits
+        return CandidateFits(self.dists, samples, qmethod_str,
+                             subsample=self.subsample,
+                             executor=executor,
+                             max_workers=max_workers,
+                             processes=processes,
+                             deadline=deadline)
+
+
+    def set_subsample(self, subsample):
+        """Fit on 'subsample' selected order statistics (None: all samples)"""
+
+        self.subsample = subsample
 
 
     def get_count(self):
@@ -111,19 +147,45 @@ class SupportedDistributions():
         return cls.subclasses[dist_str](dist_str)
 
 
-    # Decorator to return the value of the location parameter, if it exists
+    # Return the registered subclass; its metadata (has_shape, loc_optional,
+    # scipy_name, ...) are class attributes, so no instance is needed.
     @classmethod
-    def has_optional_loc_param(cls, dist_str):
+    def get_subclass(cls, dist_str):
         if dist_str not in cls.subclasses:
             raise ValueError("Invalid distribution: %s" %dist_str)
-        return cls.subclasses[dist_str](dist_str).loc_optional  
+        return cls.subclasses[dist_str]
 
 
-    def feed_samples(self, samples):
+    # Decorator to return the value of the location parameter, if it exists
+    @classmethod
+    def has_optional_loc_param(cls, dist_str):
+        return cls.get_subclass(dist_str).loc_optional
+
+
+    def feed_samples(self, samples, presorted=False, subsample=None):
         """Store samples and num. of samples in the object as attributes."""
 
-        self.samples = np.sort(samples)
+        # Already-sorted samples (e.g. from samples.load_sorted_samples) are
+        # stored as given, so memory-mapped buffers are not copied.
+        #
+        # With 'subsample', only about that many order statistics (including
+        # both tails) are selected, avoiding a full sort; their 0-based ranks
+        # are kept in self.ranks for the quantile calculation, and the number
+        # of samples each represents in self.weights for the regression.
         self.nsamples = np.size(samples)
+        self.ranks = None
+        self.weights = None
+        if subsample is not None and subsample < self.nsamples:
+            from .samples import (stratified_ranks, select_order_statistics,
+                                  rank_weights)
+            self.ranks = stratified_ranks(self.nsamples, subsample)
+            self.weights = rank_weights(self.ranks, self.nsamples)
+            self.samples = \
+                select_order_statistics(samples, self.ranks, presorted)
+        elif presorted:
+            self.samples = np.asarray(samples).ravel()
+        else:
+            self.samples = np.sort(samples, axis=None)
 
 
     def get_label(self):
@@ -179,15 +241,88 @@ class SupportedDistributions():
         self.extract_pplot_regress_quantities()
 
 
+    def _pplot_transform_data(self):
+        """Transform samples/quantiles based on prob. plotting of the distr."""
+
+        self.x, self.y = \
+            self._transform_data(self.samples, self.quantiles, self.loc)
+
+
+    def extract_pplot_regress_quantities(self):
+        """Calculate distr. parameter values from prob. plot slope/intercept."""
+
+        shape, self.loc, self.scale = \
+            self._regress_params(self.slope, self.intercept, self.loc)
+        if self.has_shape:
+            self.shape = shape
+
+
+    def calc_lmoments(self):
+        """Estimate distr. parameter values from the sample L-moments."""
+
+        # Cross-check/alternative to the regression estimates; results are
+        # stored as self.lmom_shape, self.lmom_loc and self.lmom_scale.
+        self.lmom_shape, self.lmom_loc, self.lmom_scale = \
+            self._lmoment_fit(self.samples)
+        return self.lmom_shape, self.lmom_loc, self.lmom_scale
+
+
+    def get_lmoment_strs(self):
+        """Return L-moment shape, location and scale estimates as strings."""
+
+        return tuple(str(value) if has_param else "NA"
+                     for value, has_param in
+                     ((self.lmom_shape, self.has_shape),
+                      (self.lmom_loc, self.has_loc),
+                      (self.lmom_scale, self.has_scale)))
+
+
+    def _sample_lmoments(self, values):
+        """Return (l1, l2, t3, t4) of sorted 'values' of the samples."""
+
+        from .lmoments import sample_lmoments
+        if getattr(self, 'ranks', None) is None:
+            return sample_lmoments(values)
+        return sample_lmoments(values, self.ranks, self.nsamples, self.weights)
+
+
+    def _fixed_loc(self, samples):
+        """Return the given location, one per column of 2-D 'samples'."""
+
+        return np.full(np.shape(samples)[1:], self.loc)[()]
+
+
     def _linear_regression(self):
         """Perform a linear regression on the transformed samples/quantiles."""
 
-        self.slope, self.intercept, r_value, pvalue, stderr = \
-            stats.linregress(self.x, self.y)
-        self.r2 = r_value**2.0
+        self.slope, self.intercept, self.r2 = \
+            linear_regression(self.x, self.y, getattr(self, 'weights', None))
+
+
+    def calc_confidence_band(self, level=0.95):
+        """
+        Return a simultaneous confidence band about the regression line.
 
+        Returns (position, lower, upper) in prob. plot coordinates, decimated
+        to at most bands.ConfidenceBands.max_points points.  The band spans
+        the probability axis ('quantile_axis'); 'position' is the matching
+        coordinate on the other axis, along the regression line.
+        """
 
-    def create_pplot(self, axes):
+        from .bands import ConfidenceBands
+        ranks, centers, lower, upper = \
+            ConfidenceBands.get_table(self.nsamples, self.qmethod, level)
+        center = self._transform_quantiles(centers)
+        lower = self._transform_quantiles(lower)
+        upper = self._transform_quantiles(upper)
+        if self.quantile_axis == "x":
+            position = self.slope * center + self.intercept
+        else:
+            position = (center - self.intercept) / self.slope
+        return position, lower, upper
+
+
+    def create_pplot(self, axes, band_level=None):
         """Draw probabaility plot of data on 'axes'"""
 
         liny = lambda x: self.slope * x + self.intercept
@@ -201,6 +336,15 @@ class SupportedDistributions():
                  [liny(xmin), liny(xmax)],
                  '-k',
                  label="Regression")
+        if band_level is not None:
+            position, lower, upper = self.calc_confidence_band(band_level)
+            fill = axes.fill_betweenx if self.quantile_axis == "x" \
+                else axes.fill_between
+            fill(position,
+                 lower,
+                 upper,
+                 color='0.8',
+                 label="%g%% Confidence Band" % (100.0 * band_level))
         eq = "f(t) = %6.4E*t +  %6.4E\n$R^2$=%.4f" \
             % (self.slope, self.intercept, self.r2)
         axes.text(0.1*xmax + 0.9*xmin,
@@ -217,8 +361,31 @@ class SupportedDistributions():
         """Calculate the values of the quantiles according to 'qmethod'"""
 
         n = self.nsamples
-        self.quantiles = \
-            quantiles.Quantiles.create_subclass_instance(qmethod)().get_quantiles(n)
+        self.qmethod = qmethod
+        qobj = quantiles.Quantiles.create_subclass_instance(qmethod)()
+        if getattr(self, 'ranks', None) is None:
+            self.quantiles = qobj.get_quantiles(n)
+        else:
+            self.quantiles = qobj.get_quantiles_at(n, self.ranks)
+
+
+    def calc_subsample_error(self, samples, qmethod, presorted=False):
+        """Return |subsampled - full fit| of each parameter and of R^2."""
+
+        full = type(self)(self.label)
+        if self.loc_optional:
+            full.set_location(self.loc)
+        full.feed_samples(samples, presorted)
+        full.calc_quantiles(qmethod)
+        full.eval_data()
+        errors = dict()
+        for name, has_param in (("shape", self.has_shape),
+                                ("scale", self.has_scale),
+                                ("loc", self.has_loc)):
+            if has_param:
+                errors[name] = abs(getattr(self, name) - getattr(full, name))
+        errors["r2"] = abs(self.r2 - full.r2)
+        return errors
 
     def get_scipy_command(self):
         """Return the SciPy command to instantiate distr. object using results of pplotpy"""
@@ -234,6 +401,13 @@ class SupportedDistributions():
         return text
 
 
+    def get_fitted_model(self):
+        """Return a serializable, vectorized FittedModel of the results"""
+
+        from .models import FittedModel
+        return FittedModel.from_distribution(self)
+
+
     def _calc_pdf_cdf(self, num_points=1000):
         """Populate a pdf-cdf data from scipy object."""
 
@@ -289,23 +463,43 @@ class Normal(SupportedDistributions):
     has_loc = True
     has_scale = True
     loc_optional = False
+    quantile_axis = "x"
     xlabel = r"$erf^{-1}\left[2F_X(x)-1\right]$"
     ylabel = r"$x$"
 
         
-    def _pplot_transform_data(self):
+    @classmethod
+    def _transform_data(cls, samples, quantiles, loc):
         """Transform samples/quantiles based on prob. plotting of normal distr."""
 
-        self.x = erfinv((2.0 * self.quantiles) - 1.0)
-        self.y = self.samples
+        return (cls._transform_quantiles(quantiles),
+                samples)
 
 
-    def extract_pplot_regress_quantities(self):
+    @staticmethod
+    def _transform_quantiles(quantiles):
+        """Map quantiles onto the probability axis of the normal prob. plot"""
+
+        return erfinv((2.0 * quantiles) - 1.0)
+
+
+    @staticmethod
+    def _regress_params(slope, intercept, loc):
         """Calculate scale and location values from prob. plot slope/intercept."""
 
-        self.scale = self.slope   # stdev
-        self.loc = self.intercept # mean
-        
+        # x = erfinv(2F - 1) = (y - mean) / (sqrt(2) * stdev)
+        scale = slope / np.sqrt(2.0)   # stdev
+        loc = intercept # mean
+        return None, loc, scale
+
+
+    def _lmoment_fit(self, samples):
+        """Calculate shape, location and scale values from the L-moments."""
+
+        l1, l2, t3, t4 = self._sample_lmoments(samples)
+        return None, l1, l2 * np.sqrt(np.pi)
+
+
     def _create_scipy_obj(self):
         """Instantiate a frozen scipy object for the normal distribution"""        
 
@@ -328,22 +522,43 @@ class Lognormal(SupportedDistributions):
     has_loc = True  # can be specified, default 0
     has_scale = True
     loc_optional = True
-    xlabel = r"$erf^{-1}\left[F_X(x-loc)\right]$"
+    quantile_axis = "x"
+    xlabel = r"$erf^{-1}\left[2F_X(x-loc)-1\right]$"
     ylabel = r"$\ln(x-loc)$"
     
 
-    def _pplot_transform_data(self):
+    @classmethod
+    def _transform_data(cls, samples, quantiles, loc):
         """Transf. samples/quantiles based on prob. plotting of lognormal distr."""
 
-        self.x = erfinv(self.quantiles)
-        self.y = np.log(self.samples - self.loc)
+        return (cls._transform_quantiles(quantiles),
+                np.log(samples - loc))
 
 
-    def extract_pplot_regress_quantities(self):
+    @staticmethod
+    def _transform_quantiles(quantiles):
+        """Map quantiles onto the probability axis of the lognormal prob. plot"""
+
+        return erfinv((2.0 * quantiles) - 1.0)
+
+
+    @staticmethod
+    def _regress_params(slope, intercept, loc):
         """Calculate scale and shape values from prob. plot slope/intercept."""
 
-        self.shape = self.slope * np.log(10)
-        self.scale = self.intercept # mean
+        # ln(x - loc) is normal with stdev 'shape' and mean ln(scale)
+        shape = slope / np.sqrt(2.0)
+        scale = np.exp(intercept)
+        return shape, loc, scale
+
+
+    def _lmoment_fit(self, samples):
+        """Calculate shape, location and scale values from the L-moments."""
+
+        # ln(x - loc) is normal with stdev 'shape' and mean ln(scale)
+        l1, l2, t3, t4 = self._sample_lmoments(np.log(samples - self.loc))
+        return l2 * np.sqrt(np.pi), self._fixed_loc(samples), np.exp(l1)
+
 
     def _create_scipy_obj(self):
         """Instantiate a frozen scipy object for the lognormal distribution"""
@@ -366,23 +581,41 @@ class Exponential(SupportedDistributions):
     has_loc = True # can be specified, default 0
     has_shape = False
     loc_optional = True
+    quantile_axis = "y"
     xlabel = r"$x-loc$"
     ylabel = r"$\ln\left(\frac{1}{1-F_X(x-loc)}\right)$"
  
 
-    def _pplot_transform_data(self):
+    @classmethod
+    def _transform_data(cls, samples, quantiles, loc):
         """Transf. samples/quantiles based on prob. plotting of exponential distr."""
 
-        self.x = self.samples - self.loc
-        self.y = np.log(1.0 / (1.0 - self.quantiles))
+        return (samples - loc,
+                cls._transform_quantiles(quantiles))
 
 
-    def extract_pplot_regress_quantities(self):
+    @staticmethod
+    def _transform_quantiles(quantiles):
+        """Map quantiles onto the probability axis of the exponential prob. plot"""
+
+        return np.log(1.0 / (1.0 - quantiles))
+
+
+    @staticmethod
+    def _regress_params(slope, intercept, loc):
         """Calculate scale value from prob. plot slope/intercept."""
 
-        self.scale = 1.0 / self.slope
-        
-        
+        scale = 1.0 / slope
+        return None, loc, scale
+
+
+    def _lmoment_fit(self, samples):
+        """Calculate shape, location and scale values from the L-moments."""
+
+        l1, l2, t3, t4 = self._sample_lmoments(samples)
+        return None, self._fixed_loc(samples), l1 - self.loc
+
+
     def _create_scipy_obj(self):
         """Instantiate a frozen scipy object for the exponential distribution""" 
         
@@ -405,21 +638,43 @@ class Weibull(SupportedDistributions):
     has_shape = True 
     has_loc = True # can be specified, default = 0
     loc_optional = True
+    quantile_axis = "y"
     xlabel = r"$\ln(x-loc)$"
     ylabel = r"$\ln\left[\ln\left(\frac{1}{1-F_X(x-loc)}\right)\right]$"
         
-    def _pplot_transform_data(self):
+    @classmethod
+    def _transform_data(cls, samples, quantiles, loc):
         """Transf. samples/quantiles based on prob. plotting of Weibull distr."""
 
-        self.x = np.log(self.samples - self.loc)
-        self.y = np.log(np.log(1.0 / (1.0 - self.quantiles)))
+        return (np.log(samples - loc),
+                cls._transform_quantiles(quantiles))
 
 
-    def extract_pplot_regress_quantities(self):
+    @staticmethod
+    def _transform_quantiles(quantiles):
+        """Map quantiles onto the probability axis of the Weibull prob. plot"""
+
+        return np.log(np.log(1.0 / (1.0 - quantiles)))
+
+
+    @staticmethod
+    def _regress_params(slope, intercept, loc):
         """Calculate scale and shape values from prob. plot slope/intercept."""
 
-        self.shape = self.slope
-        self.scale = np.exp(-1.0 * self.intercept/ self.slope)
+        shape = slope
+        scale = np.exp(-1.0 * intercept/ slope)
+        return shape, loc, scale
+
+
+    def _lmoment_fit(self, samples):
+        """Calculate shape, location and scale values from the L-moments."""
+
+        # l2 / l1 = 1 - 2**(-1/shape);  l1 = scale * Gamma(1 + 1/shape)
+        l1, l2, t3, t4 = self._sample_lmoments(samples - self.loc)
+        shape = -np.log(2.0) / np.log(1.0 - l2 / l1)
+        return shape, self._fixed_loc(samples), \
+            l1 / gamma(1.0 + 1.0 / shape)
+
 
     def _create_scipy_obj(self):
         """Instantiate a frozen scipy object for the weibull distribution"""        
@@ -443,21 +698,42 @@ class ExtremeValueTypeI(SupportedDistributions):
     has_loc = True
     has_scale = True
     loc_optional = False
+    quantile_axis = "y"
     xlabel = r"$x$"
     ylabel = r"$\ln\left[-\ln\left(1-F_X(x)\right)\right]$"
 
-    def _pplot_transform_data(self):
+    @classmethod
+    def _transform_data(cls, samples, quantiles, loc):
         """Transf. samples/quantiles based on prob. plotting of EV-I distr."""
 
-        self.x = self.samples
-        self.y = np.log(-1.0 * np.log(1.0 - self.quantiles))
+        return (samples,
+                cls._transform_quantiles(quantiles))
+
+
+    @staticmethod
+    def _transform_quantiles(quantiles):
+        """Map quantiles onto the probability axis of the EV-I prob. plot"""
+
+        return np.log(-1.0 * np.log(1.0 - quantiles))
 
 
-    def extract_pplot_regress_quantities(self):      
+    @staticmethod
+    def _regress_params(slope, intercept, loc):
         """Calculate scale and shape values from prob. plot slope/intercept."""
 
-        self.scale = 1.0 / self.slope
-        self.loc = 1.0 * self.intercept * self.slope
+        # ln[-ln(1 - F)] = (x - loc) / scale
+        scale = 1.0 / slope
+        loc = -1.0 * intercept / slope
+        return None, loc, scale
+
+
+    def _lmoment_fit(self, samples):
+        """Calculate shape, location and scale values from the L-moments."""
+
+        # l2 = scale * ln(2);  l1 = loc - (Euler's constant) * scale
+        l1, l2, t3, t4 = self._sample_lmoments(samples)
+        scale = l2 / np.log(2.0)
+        return None, l1 + np.euler_gamma * scale, scale
 
 
     def _create_scipy_obj(self):
@@ -482,22 +758,40 @@ class Logistic(SupportedDistributions):
     has_loc = True
     has_scale = True
     loc_optional = False
+    quantile_axis = "x"
     xlabel = r"$\tanh^{-1}\left(2*F_X{x}-1\right)$"
     ylabel = r"$x$"
 
 
-    def _pplot_transform_data(self):
+    @classmethod
+    def _transform_data(cls, samples, quantiles, loc):
         """Transf. samples/quantiles based on prob. plotting of Logistic distr."""
 
-        self.x = np.arctanh(2.0*self.quantiles - 1)
-        self.y = self.samples
+        return (cls._transform_quantiles(quantiles),
+                samples)
+
+
+    @staticmethod
+    def _transform_quantiles(quantiles):
+        """Map quantiles onto the probability axis of the Logistic prob. plot"""
+
+        return np.arctanh(2.0*quantiles - 1)
 
 
-    def extract_pplot_regress_quantities(self):      
+    @staticmethod
+    def _regress_params(slope, intercept, loc):
         """Calculate scale and location values from prob. plot slope/intercept."""
 
-        self.scale = 0.5 * self.slope
-        self.loc = self.intercept
+        scale = 0.5 * slope
+        loc = intercept
+        return None, loc, scale
+
+
+    def _lmoment_fit(self, samples):
+        """Calculate shape, location and scale values from the L-moments."""
+
+        l1, l2, t3, t4 = self._sample_lmoments(samples)
+        return None, l1, l2
 
 
     def _create_scipy_obj(self):
@@ -521,22 +815,41 @@ class Uniform(SupportedDistributions):
     has_loc = True
     has_scale = True
     loc_optional = False
+    quantile_axis = "x"
     xlabel = r"$F_X{x}$"
     ylabel = r"$x$"
 
 
-    def _pplot_transform_data(self):
+    @classmethod
+    def _transform_data(cls, samples, quantiles, loc):
         """Transf. samples/quantiles based on prob. plotting of Uniform distr."""
 
-        self.x = self.quantiles
-        self.y = self.samples
+        return (cls._transform_quantiles(quantiles),
+                samples)
 
 
-    def extract_pplot_regress_quantities(self):      
+    @staticmethod
+    def _transform_quantiles(quantiles):
+        """Map quantiles onto the probability axis of the Uniform prob. plot"""
+
+        return quantiles
+
+
+    @staticmethod
+    def _regress_params(slope, intercept, loc):
         """Calculate scale and locations values from prob. plot slope/intercept."""
 
-        self.scale = self.slope
-        self.loc = self.intercept        
+        scale = slope
+        loc = intercept
+        return None, loc, scale
+
+
+    def _lmoment_fit(self, samples):
+        """Calculate shape, location and scale values from the L-moments."""
+
+        # l1 = loc + scale / 2;  l2 = scale / 6
+        l1, l2, t3, t4 = self._sample_lmoments(samples)
+        return None, l1 - 3.0 * l2, 6.0 * l2
 
 
     def _create_scipy_obj(self):
@@ -558,22 +871,40 @@ class Cauchy(SupportedDistributions):
     has_loc = True
     has_scale = True
     loc_optional = False
+    quantile_axis = "x"
     xlabel = r"$tan\left(\pi(F_X{x}-0.5)\right)$"
     ylabel = r"$x$"
 
 
-    def _pplot_transform_data(self):
+    @classmethod
+    def _transform_data(cls, samples, quantiles, loc):
         """Transf. samples/quantiles based on prob. plotting of Cauchy distr."""
 
-        self.x = np.tan(np.pi * (self.quantiles - 0.5))
-        self.y = self.samples
+        return (cls._transform_quantiles(quantiles),
+                samples)
+
 
+    @staticmethod
+    def _transform_quantiles(quantiles):
+        """Map quantiles onto the probability axis of the Cauchy prob. plot"""
 
-    def extract_pplot_regress_quantities(self):      
+        return np.tan(np.pi * (quantiles - 0.5))
+
+
+    @staticmethod
+    def _regress_params(slope, intercept, loc):
         """Calculate scale and locations values from prob. plot slope/intercept."""
 
-        self.scale = self.slope
-        self.loc = self.intercept        
+        scale = slope
+        loc = intercept
+        return None, loc, scale
+
+
+    def _lmoment_fit(self, samples):
+        """The Cauchy distribution has no mean, so no L-moment estimates."""
+
+        nan = np.full(np.shape(samples)[1:], np.nan)[()]
+        return None, nan, nan
 
 
     def _create_scipy_obj(self):
@@ -595,22 +926,43 @@ class Rayleigh(SupportedDistributions):
     has_loc = True
     has_scale = True
     loc_optional = True
+    quantile_axis = "x"
     xlabel = r"$\sqrt{-2 \ln\left(F_X{x-loc}\right)}$"
     ylabel = r"$x-loc$"
 
 
-    def _pplot_transform_data(self):
+    @classmethod
+    def _transform_data(cls, samples, quantiles, loc):
         """Transf. samples/quantiles based on prob. plotting of Rayleigh distr."""
 
-        self.x = np.sqrt(-2.0 * np.log(1.0 - self.quantiles) )
-        self.y = self.samples
+        return (cls._transform_quantiles(quantiles),
+                samples)
+
+
+    @staticmethod
+    def _transform_quantiles(quantiles):
+        """Map quantiles onto the probability axis of the Rayleigh prob. plot"""
 
+        return np.sqrt(-2.0 * np.log(1.0 - quantiles) )
 
-    def extract_pplot_regress_quantities(self):      
+
+    @staticmethod
+    def _regress_params(slope, intercept, loc):
         """Calculate scale and locations values from prob. plot slope/intercept."""
 
-        self.scale = self.slope
-        self.loc = self.intercept        
+        scale = slope
+        loc = intercept
+        return None, loc, scale
+
+
+    def _lmoment_fit(self, samples):
+        """Calculate shape, location and scale values from the L-moments."""
+
+        # Weibull with shape 2: l1 = loc + scale*sqrt(pi/2),
+        #   l2 = scale * sqrt(pi/2) * (1 - 1/sqrt(2))
+        l1, l2, t3, t4 = self._sample_lmoments(samples)
+        scale = l2 / (np.sqrt(0.5 * np.pi) * (1.0 - np.sqrt(0.5)))
+        return None, l1 - scale * np.sqrt(0.5 * np.pi), scale
 
 
     def _create_scipy_obj(self):
@@ -618,3 +970,53 @@ class Rayleigh(SupportedDistributions):
         
         from scipy.stats import rayleigh
         self.scipy_obj = rayleigh(loc=self.loc, scale=self.scale)
+
+
+# Immutable result of fit(); parameters follow SciPy's shape/loc/scale usage
+FitResult = namedtuple("FitResult",
+                       ["distribution", "qmethod", "nsamples",
+                        "shape", "loc", "scale",
+                        "slope", "intercept", "r2"])
+
+
+def fit(dist_str, sorted_samples, qmethod="Filliben", loc=0.0):
+    """
+    Perform the prob. plot regression of 'dist_str' and return a FitResult.
+
+    Unlike SupportedDistributions objects, fit() keeps no state, so it can be
+    called concurrently from any number of threads.  The heavy stages (the
+    quantiles, transforms and regression) are NumPy/SciPy array operations,
+    which release the GIL, so a thread pool of fits scales across cores.
+    'loc' is only used by distributions with an optional location parameter.
+    """
+
+    dist_cls = SupportedDistributions.get_subclass(dist_str)
+    samples = np.asarray(sorted_samples, dtype=float).ravel()
+    n = samples.size
+    if not dist_cls.loc_optional:
+        loc = 0.0
+    quantile_values = quantiles.Quantiles.create_subclass_instance(qmethod)() \
+        .get_quantiles(n)
+    x, y = dist_cls._transform_data(samples, quantile_values, loc)
+    slope, intercept, r2 = linear_regression(x, y)
+    shape, loc, scale = dist_cls._regress_params(slope, intercept, loc)
+    return FitResult(dist_str, qmethod, n, shape, loc, scale,
+                     slope, intercept, r2)
+
+
+def linear_regression(x, y, weights=None):
+    """Return slope, intercept and R^2 of a (weighted) least-squares line."""
+
+    if weights is None:
+        xmean, ymean = np.mean(x), np.mean(y)
+        dx, dy = x - xmean, y - ymean
+        sxx, syy, sxy = np.dot(dx, dx), np.dot(dy, dy), np.dot(dx, dy)
+    else:
+        # Weighted, e.g. to approximate the fit to all samples from a subset
+        w = weights / np.sum(weights)
+        xmean, ymean = np.dot(w, x), np.dot(w, y)
+        dx, dy = x - xmean, y - ymean
+        sxx, syy, sxy = np.dot(w, dx * dx), np.dot(w, dy * dy), np.dot(w, dx * dy)
+    slope = sxy / sxx
+    intercept = ymean - slope * xmean
+    return slope, intercept, sxy**2.0 / (sxx * syy)
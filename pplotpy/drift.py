@@ -0,0 +1,179 @@
+###############################################################################
+#
+#    pplotpy - a probability plotting tool for Python
+#
+#    Copyright (C) 2017,  Nicholas A. Reynolds
+#
+#    Full License Available in LICENSE file at
+#    https://github.com/nicholasareynolds/pplotpy
+#
+###############################################################################
+
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from .models import FittedModel
+
+
+DriftResult = namedtuple("DriftResult",
+                         ["nsamples",       # Number of samples in the batch
+                          "ks",             # KS statistic vs. fitted cdf
+                          "ks_pvalue",      # Asymptotic p-value of 'ks'
+                          "ad",             # Anderson-Darling A^2 vs. fitted cdf
+                          "ks_2samp",       # Two-sample KS vs. reference samples
+                          "ks_2samp_pvalue",
+                          "drifted",        # Any p-value below 'alpha'
+                          "ndropped"])      # Non-finite samples left out
+
+
+class Baseline():
+    """
+    Cached baseline fit against which new batches of samples are compared.
+
+    A baseline holds a FittedModel (the fitted cdf) and, optionally, the sorted
+    reference samples.  Each batch is tested with the one-sample Kolmogorov-
+    Smirnov and Anderson-Darling statistics against the fitted cdf, and, when
+    reference samples are available, with the two-sample Kolmogorov-Smirnov
+    statistic, found by a linear merge of the two sorted arrays.  Non-finite
+    samples are left out of both, and counted in the result.  The
+    baseline is not modified by a comparison, so many batches can be checked
+    against one baseline, concurrently if desired.
+    """
+
+    def __init__(self, model=None, reference=None, presorted=False,
+                 alpha=0.05):
+        """Store the fitted model and (sorted) reference samples"""
+
+        if model is None and reference is None:
+            raise ValueError("A fitted model or reference samples are required")
+        self.model = model
+        if reference is not None:
+            reference = np.asarray(reference, dtype=float).ravel()
+            reference = reference[np.isfinite(reference)]
+            if not presorted:
+                reference = np.sort(reference)
+        self.reference = reference
+        self.alpha = alpha
+
+
+    @classmethod
+    def from_distribution(cls, dist_obj, alpha=0.05):
+        """Create a baseline from an evaluated SupportedDistributions object"""
+
+        # Subsampled fits only hold selected order statistics, which are not
+        # a valid reference sample.
+        if getattr(dist_obj, 'ranks', None) is None:
+            reference = dist_obj.samples
+        else:
+            reference = None
+        return cls(dist_obj.get_fitted_model(), reference, presorted=True,
+                   alpha=alpha)
+
+
+    def save(self, path):
+        """Write the baseline (model and reference samples) to a *.npz file"""
+
+        arrays = dict(alpha=np.array(self.alpha))
+        if self.model is not None:
+            arrays["model"] = np.array(self.model.to_json())
+        if self.reference is not None:
+            arrays["reference"] = self.reference
+        np.savez(path, **arrays)
+
+
+    @classmethod
+    def load(cls, path):
+        """Read a baseline written by save()"""
+
+        with np.load(path) as stored:
+            model = None
+            if "model" in stored.files:
+                model = FittedModel.from_json(stored["model"].item())
+            reference = stored["reference"] if "reference" in stored.files \
+                else None
+            return cls(model, reference, presorted=True,
+                       alpha=stored["alpha"].item())
+
+
+    def compare(self, batch, presorted=False):
+        """Return a DriftResult for one batch of samples"""
+
+        batch = np.asarray(batch, dtype=float).ravel()
+        finite = np.isfinite(batch)
+        ndropped = batch.size - int(np.count_nonzero(finite))
+        if ndropped:
+            batch = batch[finite]
+        if not presorted:
+            batch = np.sort(batch)
+        m = batch.size
+
+        ks = ks_pvalue = ad = ks_2samp = ks_2samp_pvalue = np.nan
+        if self.model is not None and m > 0:
+            ks, ad = _ks_ad_statistics(self.model, batch)
+            ks_pvalue = _kolmogorov_sf((np.sqrt(m) + 0.12 + 0.11 / np.sqrt(m))
+                                       * ks)
+        if self.reference is not None and m > 0:
+            n = self.reference.size
+            ks_2samp = _ks_2samp_statistic(self.reference, batch)
+            ne = n * m / (n + m)
+            ks_2samp_pvalue = _kolmogorov_sf(
+                (np.sqrt(ne) + 0.12 + 0.11 / np.sqrt(ne)) * ks_2samp)
+
+        drifted = bool(ks_pvalue < self.alpha or ks_2samp_pvalue < self.alpha)
+        return DriftResult(m, ks, ks_pvalue, ad, ks_2samp, ks_2samp_pvalue,
+                           drifted, ndropped)
+
+
+    def compare_many(self, batches, presorted=False, workers=None):
+        """Return a DriftResult for each batch, optionally using threads"""
+
+        compare = lambda batch: self.compare(batch, presorted)
+        if workers is None or workers <= 1:
+            return [compare(batch) for batch in batches]
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(compare, batches))
+
+
+def _ks_ad_statistics(model, batch):
+    """Return the KS and Anderson-Darling statistics of sorted 'batch'"""
+
+    m = batch.size
+    cdf = model.cdf(batch)
+    i = np.arange(1, m + 1)
+    ks = max(np.max(i / m - cdf), np.max(cdf - (i - 1) / m))
+
+    # A^2 = -m - (1/m) sum (2i - 1) [ln F(x_i) + ln(1 - F(x_(m+1-i)))]
+    tiny = np.finfo(float).tiny
+    log_cdf = np.log(np.maximum(cdf, tiny))
+    log_sf = np.log(np.maximum(model.sf(batch), tiny))
+    ad = -m - np.dot(2 * i - 1, log_cdf + log_sf[::-1]) / m
+    return ks, ad
+
+
+def _ks_2samp_statistic(a, b):
+    """Return the two-sample KS statistic of sorted arrays 'a' and 'b'"""
+
+    # A stable sort of two concatenated sorted runs is a single linear merge
+    n, m = a.size, b.size
+    values = np.concatenate((a, b))
+    order = np.argsort(values, kind='stable')
+    steps = np.where(order < n, 1.0 / n, -1.0 / m)
+    diff = np.cumsum(steps)
+    # Only compare the empirical cdfs after the last of any tied values
+    values = values[order]
+    last = np.append(values[1:] != values[:-1], True)
+    return np.max(np.abs(diff[last]))
+
+
+def _kolmogorov_sf(lam):
+    """Survival function of the Kolmogorov distribution at 'lam'"""
+
+    if np.isnan(lam):
+        return np.nan
+    if lam < 0.2:
+        return 1.0
+    k = np.arange(1, 101)
+    terms = (-1.0) ** (k - 1) * np.exp(-2.0 * k * k * lam * lam)
+    return float(min(1.0, max(0.0, 2.0 * np.sum(terms))))
@@ -0,0 +1,72 @@
+###############################################################################
+#
+#    pplotpy - a probability plotting tool for Python
+#
+#    Copyright (C) 2017,  Nicholas A. Reynolds
+#
+#    Full License Available in LICENSE file at
+#    https://github.com/nicholasareynolds/pplotpy
+#
+###############################################################################
+
+import numpy as np
+
+
+#   Information on L-moments:
+#   [a] Hosking, J. R. M. (1990), L-moments: Analysis and Estimation of
+#       Distributions using Linear Combinations of Order Statistics, Journal
+#       of the Royal Statistical Society, Series B, 52(1), pp. 105-124.
+#   [b] Hosking, J. R. M. and Wallis, J. R. (1997), Regional Frequency
+#       Analysis, Cambridge University Press, Appendix.
+
+
+def sample_lmoments(samples, ranks=None, n=None, weights=None):
+    """
+    Return the sample L-moments (l1, l2, t3, t4) of sorted 'samples'.
+
+    The unbiased probability-weighted moments b0..b3 are linear in the order
+    statistics, so all four are found in a single pass (one matrix product).
+    'samples' may be 2-D with one sorted column per data set, in which case
+    each returned value is an array over the columns.
+
+    For samples that are only selected order statistics (see
+    feed_samples(subsample=...)), pass their 0-based 'ranks' out of 'n' and
+    the number of order statistics each represents in 'weights'.
+    """
+
+    samples = np.asarray(samples, dtype=float)
+    if ranks is None:
+        n = samples.shape[0]
+        j = np.arange(n, dtype=float)
+        w = np.full(n, 1.0 / n)
+    else:
+        j = np.asarray(ranks, dtype=float)
+        w = np.asarray(weights, dtype=float) / n
+
+    # Row r holds j(j-1)...(j-r+1) / ((n-1)(n-2)...(n-r)) for 0-based rank j
+    coeffs = np.empty((4, j.size))
+    coeffs[0] = w
+    for r in range(1, 4):
+        coeffs[r] = coeffs[r - 1] * (j - r + 1) / (n - r)
+    b0, b1, b2, b3 = coeffs @ samples
+
+    l1 = b0
+    l2 = 2.0 * b1 - b0
+    l3 = 6.0 * b2 - 6.0 * b1 + b0
+    l4 = 20.0 * b3 - 30.0 * b2 + 12.0 * b1 - b0
+    return l1, l2, l3 / l2, l4 / l2
+
+
+def lmoment_fit(dist_str, samples, loc=0.0):
+    """
+    Return (shape, loc, scale) L-moment estimates for distribution 'dist_str'.
+
+    'samples' must be sorted; columns of a 2-D array are fitted separately.
+    'loc' is the location parameter for distributions where it is specified
+    by the user (see SupportedDistributions.has_optional_loc_param).
+    """
+
+    from .distributions import SupportedDistributions
+    dist_obj = SupportedDistributions.create_subclass_instance(dist_str)
+    dist_obj.set_location(loc)
+    return dist_obj._lmoment_fit(np.asarray(samples, dtype=float))
@@ -0,0 +1,527 @@
+###############################################################################
+#
+#    pplotpy - a probability plotting tool for Python
+#
+#    Copyright (C) 2017,  Nicholas A. Reynolds
+#
+#    Full License Available in LICENSE file at
+#    https://github.com/nicholasareynolds/pplotpy
+#
+###############################################################################
+
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+
+class FittedModel():
+    """
+    Serializable, vectorized form of a fitted distribution.
+
+    A FittedModel holds the parameter values found by pplotpy (using SciPy's
+    shape/loc/scale conventions, see SupportedDistributions.get_scipy_command)
+    and evaluates the cdf, sf, ppf and pdf with closed-form NumPy expressions,
+    so that large arrays can be scored without SciPy.  Each method accepts an
+    'out' buffer and evaluates the input in chunks of 'chunk_size' values,
+    optionally on 'workers' threads (NumPy releases the GIL in its ufuncs).
+    """
+
+    subclasses = {}   # Empty container for families to be registered at
+
+    chunk_size = 1 << 18   # Default number of values evaluated per chunk
+
+
+    def __init__(self, shape=None, loc=0.0, scale=1.0, label=None, r2=None):
+        """Store the parameter values of the fitted distribution"""
+
+        self.shape = None if shape is None else float(shape)
+        self.loc = float(loc)
+        self.scale = float(scale)
+        self.label = label
+        self.r2 = None if r2 is None else float(r2)
+
+
+    # Decorator to store a family subclass under its SciPy name
+    @classmethod
+    def register_family(cls, scipy_name):
+        def decorator(subclass):
+            cls.subclasses[scipy_name] = subclass
+            subclass.scipy_name = scipy_name
+            return subclass
+        return decorator
+
+
+    # Instantiate a fitted model from its SciPy name and parameter values
+    @classmethod
+    def create_subclass_instance(cls, scipy_name, **params):
+        if scipy_name not in cls.subclasses:
+            raise ValueError("Invalid distribution: %s" % scipy_name)
+        return cls.subclasses[scipy_name](**params)
+
+
+    @classmethod
+    def from_distribution(cls, dist_obj):
+        """Create a fitted model from an evaluated SupportedDistributions obj."""
+
+        return cls.create_subclass_instance(
+            dist_obj.scipy_name,
+            shape=dist_obj.shape if dist_obj.has_shape else None,
+            loc=dist_obj.loc,
+            scale=dist_obj.scale,
+            label=dist_obj.get_label(),
+            r2=dist_obj.r2)
+
+
+    def to_dict(self):
+        """Return the model as a JSON-compatible dictionary"""
+
+        return {"distribution": self.scipy_name,
+                "label": self.label,
+                "shape": self.shape,
+                "loc": self.loc,
+                "scale": self.scale,
+                "r2": self.r2}
+
+
+    @classmethod
+    def from_dict(cls, params):
+        """Create a fitted model from the output of to_dict()"""
+
+        params = dict(params)
+        return cls.create_subclass_instance(params.pop("distribution"),
+                                            **params)
+
+
+    def to_json(self):
+        """Return the model as a JSON string"""
+
+        return json.dumps(self.to_dict())
+
+
+    @classmethod
+    def from_json(cls, text):
+        """Create a fitted model from the output of to_json()"""
+
+        return cls.from_dict(json.loads(text))
+
+
+    def save(self, path):
+        """Write the model to a *.json or *.npz file"""
+
+        if path.endswith('.npz'):
+            params = {key: np.array(np.nan if val is None else val)
+                      for key, val in self.to_dict().items()
+                      if key not in ("distribution", "label")}
+            np.savez(path,
+                     distribution=np.array(self.scipy_name),
+                     label=np.array(self.label or ""),
+                     **params)
+        else:
+            with open(path, 'w') as fileobj:
+                fileobj.write(self.to_json())
+
+
+    @classmethod
+    def load(cls, path):
+        """Read a model written by save()"""
+
+        if path.endswith('.npz'):
+            with np.load(path) as stored:
+                params = {key: stored[key].item() for key in stored.files}
+            for key in ("shape", "r2"):
+                if np.isnan(params[key]):
+                    params[key] = None
+            params["label"] = params["label"] or None
+            return cls.from_dict(params)
+        with open(path) as fileobj:
+            return cls.from_json(fileobj.read())
+
+
+    def cdf(self, x, out=None, chunk_size=None, workers=None):
+        """Cumulative distribution function evaluated at 'x'"""
+
+        return self._evaluate(self._cdf, x, out, chunk_size, workers)
+
+
+    def sf(self, x, out=None, chunk_size=None, workers=None):
+        """Survival (exceedance) function, 1 - cdf, evaluated at 'x'"""
+
+        return self._evaluate(self._sf, x, out, chunk_size, workers)
+
+
+    def pdf(self, x, out=None, chunk_size=None, workers=None):
+        """Probability density function evaluated at 'x'"""
+
+        return self._evaluate(self._pdf, x, out, chunk_size, workers)
+
+
+    def ppf(self, q, out=None, chunk_size=None, workers=None):
+        """Percent point function (inverse of cdf) evaluated at 'q'"""
+
+        return self._evaluate(self._checked_ppf, q, out, chunk_size, workers)
+
+
+    def _checked_ppf(self, q):
+        """Return ppf values, NaN wherever 'q' is outside [0, 1]"""
+
+        values = self._ppf(q)
+        values[~((q >= 0.0) & (q <= 1.0))] = np.nan
+        return values
+
+
+    def _evaluate(self, func, x, out, chunk_size, workers):
+        """Apply 'func' to 'x' chunk-by-chunk, writing results into 'out'"""
+
+        x = np.asarray(x, dtype=float)
+        if out is None:
+            out = np.empty(x.shape)
+        elif out.shape != x.shape:
+            raise ValueError("'out' must have the same shape as the input")
+        flat_x, flat_out = x.reshape(-1), out.reshape(-1)
+        if not np.may_share_memory(flat_out, out):
+            raise ValueError("'out' must be contiguous")
+        chunk_size = chunk_size or self.chunk_size
+
+        def evaluate_chunk(start):
+            with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+                chunk = flat_x[start:start + chunk_size]
+                flat_out[start:start + chunk_size] = func(chunk)
+
+        starts = range(0, flat_x.size, chunk_size)
+        if workers is None or workers <= 1 or len(starts) <= 1:
+            for start in starts:
+                evaluate_chunk(start)
+        else:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                list(executor.map(evaluate_chunk, starts))
+        return out
+
+
+    def _standardize(self, x):
+        """Return (x - loc) / scale"""
+
+        return (x - self.loc) / self.scale
+
+
+@FittedModel.register_family("norm")
+class NormalModel(FittedModel):
+    """Normal distribution; scipy.stats.norm"""
+
+    def _cdf(self, x):
+        return _ndtr(self._standardize(x))
+
+    def _sf(self, x):
+        return _ndtr(-self._standardize(x))
+
+    def _pdf(self, x):
+        z = self._standardize(x)
+        return np.exp(-0.5 * z * z) / (_SQRT_2PI * self.scale)
+
+    def _ppf(self, q):
+        return self.loc + self.scale * _ndtri(q)
+
+
+@FittedModel.register_family("lognorm")
+class LognormalModel(FittedModel):
+    """Lognormal distribution; scipy.stats.lognorm"""
+
+    def _log_z(self, x):
+        y = self._standardize(x)
+        return np.log(np.where(y > 0.0, y, np.nan)) / self.shape, y
+
+    def _cdf(self, x):
+        z, y = self._log_z(x)
+        return np.where(y > 0.0, _ndtr(z), 0.0)
+
+    def _sf(self, x):
+        z, y = self._log_z(x)
+        return np.where(y > 0.0, _ndtr(-z), 1.0)
+
+    def _pdf(self, x):
+        z, y = self._log_z(x)
+        density = np.exp(-0.5 * z * z) / (_SQRT_2PI * self.shape * y)
+        return np.where(y > 0.0, density / self.scale, 0.0)
+
+    def _ppf(self, q):
+        return self.loc + self.scale * np.exp(self.shape * _ndtri(q))
+
+
+@FittedModel.register_family("expon")
+class ExponentialModel(FittedModel):
+    """Exponential distribution; scipy.stats.expon"""
+
+    def _cdf(self, x):
+        y = self._standardize(x)
+        return np.where(y > 0.0, -np.expm1(-y), 0.0)
+
+    def _sf(self, x):
+        y = self._standardize(x)
+        return np.where(y > 0.0, np.exp(-y), 1.0)
+
+    def _pdf(self, x):
+        y = self._standardize(x)
+        return np.where(y >= 0.0, np.exp(-y) / self.scale, 0.0)
+
+    def _ppf(self, q):
+        return self.loc - self.scale * np.log1p(-q)
+
+
+@FittedModel.register_family("frechet_r")
+class WeibullModel(FittedModel):
+    """Weibull distribution; scipy.stats.frechet_r (now weibull_min)"""
+
+    def _cdf(self, x):
+        y = np.maximum(self._standardize(x), 0.0)
+        return -np.expm1(-y ** self.shape)
+
+    def _sf(self, x):
+        y = np.maximum(self._standardize(x), 0.0)
+        return np.exp(-y ** self.shape)
+
+    def _pdf(self, x):
+        y = self._standardize(x)
+        yp = np.where(y > 0.0, y, 1.0)
+        density = self.shape * yp ** (self.shape - 1.0) \
+            * np.exp(-yp ** self.shape) / self.scale
+        return np.where(y > 0.0, density, 0.0)
+
+    def _ppf(self, q):
+        return self.loc + self.scale * (-np.log1p(-q)) ** (1.0 / self.shape)
+
+
+@FittedModel.register_family("gumbel_l")
+class ExtremeValueTypeIModel(FittedModel):
+    """Extreme Value, Type I (minimum) distribution; scipy.stats.gumbel_l"""
+
+    def _cdf(self, x):
+        return -np.expm1(-np.exp(self._standardize(x)))
+
+    def _sf(self, x):
+        return np.exp(-np.exp(self._standardize(x)))
+
+    def _pdf(self, x):
+        y = self._standardize(x)
+        return np.exp(y - np.exp(y)) / self.scale
+
+    def _ppf(self, q):
+        return self.loc + self.scale * np.log(-np.log1p(-q))
+
+
+@FittedModel.register_family("logistic")
+class LogisticModel(FittedModel):
+    """Logistic distribution; scipy.stats.logistic"""
+
+    def _cdf(self, x):
+        return 1.0 / (1.0 + np.exp(-self._standardize(x)))
+
+    def _sf(self, x):
+        return 1.0 / (1.0 + np.exp(self._standardize(x)))
+
+    def _pdf(self, x):
+        e = np.exp(-np.abs(self._standardize(x)))
+        return e / ((1.0 + e) ** 2 * self.scale)
+
+    def _ppf(self, q):
+        return self.loc + self.scale * (np.log(q) - np.log1p(-q))
+
+
+@FittedModel.register_family("uniform")
+class UniformModel(FittedModel):
+    """Uniform distribution; scipy.stats.uniform"""
+
+    def _cdf(self, x):
+        return np.clip(self._standardize(x), 0.0, 1.0)
+
+    def _sf(self, x):
+        return np.clip(1.0 - self._standardize(x), 0.0, 1.0)
+
+    def _pdf(self, x):
+        y = self._standardize(x)
+        return np.where((y >= 0.0) & (y <= 1.0), 1.0 / self.scale, 0.0)
+
+    def _ppf(self, q):
+        return self.loc + self.scale * q
+
+
+@FittedModel.register_family("cauchy")
+class CauchyModel(FittedModel):
+    """Cauchy distribution; scipy.stats.cauchy"""
+
+    def _cdf(self, x):
+        return np.arctan2(1.0, -self._standardize(x)) / np.pi
+
+    def _sf(self, x):
+        return np.arctan2(1.0, self._standardize(x)) / np.pi
+
+    def _pdf(self, x):
+        y = self._standardize(x)
+        return 1.0 / (np.pi * self.scale * (1.0 + y * y))
+
+    def _ppf(self, q):
+        # tan(pi (q - 1/2)) written as cotangents to keep the tails accurate
+        y = np.where(q < 0.5,
+                     -1.0 / np.tan(np.pi * q),
+                     1.0 / np.tan(np.pi * (1.0 - q)))
+        return self.loc + self.scale * y
+
+
+@FittedModel.register_family("rayleigh")
+class RayleighModel(FittedModel):
+    """Rayleigh distribution; scipy.stats.rayleigh"""
+
+    def _cdf(self, x):
+        y = np.maximum(self._standardize(x), 0.0)
+        return -np.expm1(-0.5 * y * y)
+
+    def _sf(self, x):
+        y = np.maximum(self._standardize(x), 0.0)
+        return np.exp(-0.5 * y * y)
+
+    def _pdf(self, x):
+        y = np.maximum(self._standardize(x), 0.0)
+        return y * np.exp(-0.5 * y * y) / self.scale
+
+    def _ppf(self, q):
+        return self.loc + self.scale * np.sqrt(-2.0 * np.log1p(-q))
+
+
+# Standard normal cdf and its inverse, without SciPy
+
+_SQRT_2PI = np.sqrt(2.0 * np.pi)
+
+
+# W. J. Cody, "Rational Chebyshev approximations for the error function",
+# Math. Comp. 23 (1969); coefficients as in his CALERF, highest order first.
+_ERF_A = (1.85777706184603153e-1, 3.16112374387056560e00,
+          1.13864154151050156e02, 3.77485237685302021e02,
+          3.20937758913846947e03)
+_ERF_B = (1.0, 2.36012909523441209e01, 2.44024637934444173e02,
+          1.28261652607737228e03, 2.84423683343917062e03)
+_ERFC_C = (2.15311535474403846e-8, 5.64188496988670089e-1,
+           8.88314979438837594e00, 6.61191906371416295e01,
+           2.98635138197400131e02, 8.81952221241769090e02,
+           1.71204761263407058e03, 2.05107837782607147e03,
+           1.23033935479799725e03)
+_ERFC_D = (1.0, 1.57449261107098347e01, 1.17693950891312499e02,
+           5.37181101862009858e02, 1.62138957456669019e03,
+           3.29079923573345963e03, 4.36261909014324716e03,
+           3.43936767414372164e03, 1.23033935480374942e03)
+_ERFC_P = (1.63153871373020978e-2, 3.05326634961232344e-1,
+           3.60344899949804439e-1, 1.25781726111229246e-1,
+           1.60837851487422766e-2, 6.58749161529837803e-4)
+_ERFC_Q = (1.0, 2.56852019228982242e00, 1.87295284992346725e00,
+           5.27905102951428412e-1, 6.05183413124413191e-2,
+           2.33520497626869185e-3)
+
+# M. J. Wichura, "Algorithm AS 241: The percentage points of the normal
+# distribution", Appl. Statist. 37 (1988); PPND16, highest order first.
+_NDTRI_A = (2.5090809287301226727e3, 3.3430575583588128105e4,
+            6.7265770927008700853e4, 4.5921953931549871457e4,
+            1.3731693765509461125e4, 1.9715909503065514427e3,
+            1.3314166789178437745e2, 3.3871328727963666080e0)
+_NDTRI_B = (5.2264952788528545610e3, 2.8729085735721942674e4,
+            3.9307895800092710610e4, 2.1213794301586595867e4,
+            5.3941960214247511077e3, 6.8718700749205790830e2,
+            4.2313330701600911252e1, 1.0)
+_NDTRI_C = (7.74545014278341407640e-4, 2.27238449892691845833e-2,
+            2.41780725177450611770e-1, 1.27045825245236838258e0,
+            3.64784832476320460504e0, 5.76949722146069140550e0,
+            4.63033784615654529590e0, 1.42343711074968357734e0)
+_NDTRI_D = (1.05075007164441684324e-9, 5.47593808499534494600e-4,
+            1.51986665636164571966e-2, 1.48103976427480074590e-1,
+            6.89767334985100004550e-1, 1.67638483018380384940e0,
+            2.05319162663775882187e0, 1.0)
+_NDTRI_E = (2.01033439929228813265e-7, 2.71155556874348757815e-5,
+            1.24266094738807843860e-3, 2.65321895265761230930e-2,
+            2.96560571828504891230e-1, 1.78482653991729133580e0,
+            5.46378491116411436990e0, 6.65790464350110377720e0)
+_NDTRI_F = (2.04426310338993978564e-15, 1.42151175831644588870e-7,
+            1.84631831751005468180e-5, 7.86869131145613259100e-4,
+            1.48753612908506148525e-2, 1.36929880922735805310e-1,
+            5.99832206555887937690e-1, 1.0)
+
+
+def _erfc(x):
+    """Complementary error function, to full double precision"""
+
+    # Cody's rational approximations on |x| <= 0.46875 (for erf), up to 4,
+    # and beyond; erfc(-x) = 2 - erfc(x).
+    x = np.asarray(x, dtype=float)
+    ax = np.abs(x)
+    result = np.zeros_like(ax)
+
+    small = ax <= 0.46875
+    xs = ax[small]
+    x2 = xs * xs
+    result[small] = 1.0 - xs * _polyval(_ERF_A, x2) / _polyval(_ERF_B, x2)
+
+    mid = ~small & (ax <= 4.0)
+    xm = ax[mid]
+    result[mid] = np.exp(-xm * xm) \
+        * _polyval(_ERFC_C, xm) / _polyval(_ERFC_D, xm)
+
+    large = (ax > 4.0) & (ax < 26.543)   # erfc underflows to 0 beyond
+    xl = ax[large]
+    r2 = 1.0 / (xl * xl)
+    result[large] = _exp_neg_square(xl) / xl \
+        * (1.0 / np.sqrt(np.pi)
+           - r2 * _polyval(_ERFC_P, r2) / _polyval(_ERFC_Q, r2))
+    result[np.isnan(x)] = np.nan
+
+    return np.where(x < 0.0, 2.0 - result, result)
+
+
+def _polyval(coeffs, x):
+    """Evaluate the polynomial with 'coeffs' (highest order first) at 'x'"""
+
+    # Horner's rule in place; unlike np.polyval, no temporary per term
+    result = np.full_like(x, coeffs[0])
+    for coeff in coeffs[1:]:
+        result *= x
+        result += coeff
+    return result
+
+
+def _exp_neg_square(x):
+    """exp(-x^2), split to keep its relative accuracy for x > 4"""
+
+    # exp(-xr^2) exp(-(x - xr)(x + xr)), with xr = x rounded down to 1/16
+    xr = np.floor(x * 16.0) / 16.0
+    return np.exp(-xr * xr) * np.exp(-(x - xr) * (x + xr))
+
+
+def _ndtr(z):
+    """Standard normal cdf"""
+
+    return 0.5 * _erfc(-np.asarray(z, dtype=float) / np.sqrt(2.0))
+
+
+def _ndtri(q):
+    """Inverse of the standard normal cdf, to full double precision"""
+
+    # Wichura's AS 241: a rational approximation in q - 1/2 for
+    # |q - 1/2| <= 0.425, otherwise in r = sqrt(-log(min(q, 1 - q))),
+    # split at r = 5; the upper tail follows by symmetry.
+    q = np.asarray(q, dtype=float)
+    d = q - 0.5
+    result = np.empty_like(d)
+
+    central = np.abs(d) <= 0.425
+    dc = d[central]
+    r = 0.180625 - dc * dc
+    result[central] = dc * _polyval(_NDTRI_A, r) / _polyval(_NDTRI_B, r)
+
+    tail = ~central
+    with np.errstate(divide='ignore', invalid='ignore'):
+        r = np.sqrt(-np.log(np.minimum(q[tail], 1.0 - q[tail])))
+    near = r <= 5.0
+    x = np.where(near, 0.0, np.inf)
+    x[near] = _polyval(_NDTRI_C, r[near] - 1.6) \
+        / _polyval(_NDTRI_D, r[near] - 1.6)
+    far = ~near & np.isfinite(r)
+    x[far] = _polyval(_NDTRI_E, r[far] - 5.0) \
+        / _polyval(_NDTRI_F, r[far] - 5.0)
+    x[np.isnan(r)] = np.nan
+    result[tail] = np.where(d[tail] < 0.0, -x, x)
+    return result
@@ -0,0 +1,329 @@
+###############################################################################
+#
+#    pplotpy - a probability plotting tool for Python
+#
+#    Copyright (C) 2017,  Nicholas A. Reynolds
+#
+#    Full License Available in LICENSE file at
+#    https://github.com/nicholasareynolds/pplotpy
+#
+###############################################################################
+
+import os
+import threading
+import time
+import weakref
+from concurrent.futures import (FIRST_COMPLETED, ProcessPoolExecutor,
+                                ThreadPoolExecutor, TimeoutError, wait)
+
+import numpy as np
+
+
+class FitCancelled(Exception):
+    """Reported for a candidate fit that was cancelled before completing"""
+
+    pass
+
+
+def prepare_samples(samples, subsample=None):
+    """
+    Return one array of samples that every candidate fit can share.
+
+    The samples are sorted once; with 'subsample', they are only partitioned
+    about the selected ranks (samples.partition_ranks), which is all
+    feed_samples(presorted=True, subsample=...) reads.
+    """
+
+    samples = np.asarray(samples).ravel()
+    if subsample is not None and subsample < samples.size:
+        from .samples import partition_ranks, stratified_ranks
+        return partition_ranks(samples,
+                               stratified_ranks(samples.size, subsample))
+    return np.sort(samples)
+
+
+class CandidateFits():
+    """
+    Candidate fits running concurrently on a thread or process executor.
+
+    Created by CandidateDistributions.calc_all_async.  All fits share one
+    prepared (sorted) copy of the samples: threads read the same array, and
+    process workers attach to it through shared memory rather than receiving
+    a pickled copy per task, and send back only the fitted parameters.
+    as_completed() yields each distribution object
+    as its fit finishes, fails, times out, or is cancelled.
+
+    'deadline' is the time in seconds allowed per fit, measured from its
+    start.  Threads record the start themselves; in processes, where it
+    cannot be observed, no more fits are submitted than there are workers, so
+    each one starts when it is submitted.  Thread fits check for cancellation
+    between stages and stop at the next one; running process fits are left to
+    finish, but their results are discarded.  Shared memory is freed once all
+    fits are collected, on cancel() or close(), or on leaving a 'with' block.
+    """
+
+    poll_interval = 0.05   # Seconds between deadline checks
+
+
+    def __init__(self, dists, samples, qmethod_str, subsample=None,
+                 executor=None, max_workers=None, processes=False,
+                 deadline=None):
+        """Prepare the shared samples and submit a fit for each candidate"""
+
+        self.dists = list(dists)
+        self.qmethod_str = qmethod_str
+        self.subsample = subsample
+        self.deadline = deadline
+        self.samples = prepare_samples(samples, subsample)
+
+        self._owns_executor = executor is None
+        if executor is None:
+            executor = ProcessPoolExecutor(max_workers) if processes \
+                else ThreadPoolExecutor(max_workers)
+        self.executor = executor
+        self.processes = isinstance(executor, ProcessPoolExecutor)
+
+        self._cancel_event = threading.Event()
+        self._cancelled = set()
+        self._started = dict()
+        self._shm = None
+        self.futures = dict()   # future -> index in self.dists
+        self._queued = list(range(len(self.dists)))
+
+        # Fits waiting in a process pool's queue must not use up their
+        # deadline, so only as many are submitted as there are workers.
+        self._window = len(self.dists)
+        if self.processes:
+            self._window = max_workers or \
+                getattr(executor, '_max_workers', None) or os.cpu_count() or 1
+            self._share_samples()
+        self._submit_queued()
+
+
+    def as_completed(self):
+        """Yield (dist_obj, error) for each fit as it finishes (error: None)"""
+
+        pending = dict(self.futures)
+        try:
+            while pending or self._queued:
+                pending.update(self._submit_queued())
+                # Also wake when an abandoned fit frees its worker
+                running = [future for future in self.futures
+                           if not future.done()]
+                done, _ = wait(set(pending).union(running),
+                               timeout=self._wait_timeout(pending),
+                               return_when=FIRST_COMPLETED)
+                for future in done:
+                    if future in pending:
+                        index = pending.pop(future)
+                        yield self._collect(index, future)
+                for future, index in list(pending.items()):
+                    if self._expired(index) or self._cancel_event.is_set():
+                        future.cancel()
+                        self._cancelled.add(index)
+                        del pending[future]
+                        if self._cancel_event.is_set():
+                            error = FitCancelled(self.dists[index].get_label())
+                        else:
+                            error = TimeoutError(
+                                "%s fit exceeded %s s"
+                                % (self.dists[index].get_label(), self.deadline))
+                        yield self.dists[index], error
+                if self._cancel_event.is_set():
+                    queued, self._queued = self._queued, list()
+                    for index in queued:
+                        self._cancelled.add(index)
+                        yield self.dists[index], \
+                            FitCancelled(self.dists[index].get_label())
+        finally:
+            if pending:
+                self.cancel()
+            self._release()
+
+
+    def results(self):
+        """Wait for all fits; return a list of (dist_obj, error) in order"""
+
+        collected = dict()
+        for dist_obj, error in self.as_completed():
+            collected[id(dist_obj)] = (dist_obj, error)
+        return [collected[id(dist_obj)] for dist_obj in self.dists]
+
+
+    def cancel(self):
+        """Cancel all fits that have not completed"""
+
+        # Queued fits are never submitted; as_completed() reports them
+        self._cancel_event.set()
+        for future in list(self.futures):
+            future.cancel()
+        if self._owns_executor:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+        self._release()
+
+
+    def close(self):
+        """Cancel any unfinished fits and free the shared samples"""
+
+        self.cancel()
+
+
+    def __enter__(self):
+        return self
+
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+    def _submit_queued(self):
+        """Submit queued fits while fewer than the window are running"""
+
+        submitted = dict()
+        if self._cancel_event.is_set():
+            return submitted
+        running = sum(not future.done() for future in self.futures)
+        while self._queued and running < self._window:
+            index = self._queued.pop(0)
+            if self.processes:
+                dist_obj = self.dists[index]
+                future = self.executor.submit(_fit_shared_samples,
+                                              dist_obj.get_label(),
+                                              dist_obj.loc,
+                                              self.qmethod_str,
+                                              self.subsample,
+                                              self._shm.name,
+                                              self.samples.size,
+                                              self.samples.dtype.str)
+                self._started[index] = time.monotonic()
+            else:
+                future = self.executor.submit(self._fit_in_thread, index)
+            self.futures[future] = index
+            submitted[future] = index
+            running += 1
+        return submitted
+
+
+    def _fit_in_thread(self, index):
+        """Run the fit of self.dists[index], checking for cancellation"""
+
+        self._started[index] = time.monotonic()
+        dist_obj = self.dists[index]
+        stages = (lambda: dist_obj.feed_samples(self.samples,
+                                                presorted=True,
+                                                subsample=self.subsample),
+                  lambda: dist_obj.calc_quantiles(self.qmethod_str),
+                  dist_obj.eval_data)
+        for stage in stages:
+            if self._cancel_event.is_set() or index in self._cancelled:
+                raise FitCancelled(dist_obj.get_label())
+            stage()
+        return None
+
+
+    def _collect(self, index, future):
+        """Return (dist_obj, error) for a finished future"""
+
+        dist_obj = self.dists[index]
+        if future.cancelled() or index in self._cancelled:
+            return dist_obj, FitCancelled(dist_obj.get_label())
+        error = future.exception()
+        if error is not None:
+            return dist_obj, error
+        # Only the fitted parameters come back from a worker process; the
+        # samples are re-attached from the parent's copy, and the quantiles
+        # and transformed data rebuilt from them.
+        results = future.result()
+        if results is not None:
+            dist_obj.feed_samples(self.samples,
+                                  presorted=True,
+                                  subsample=self.subsample)
+            dist_obj.__dict__.update(results)
+            dist_obj.calc_quantiles(self.qmethod_str)
+            dist_obj._pplot_transform_data()
+        return dist_obj, None
+
+
+    def _expired(self, index):
+        """Whether the fit of self.dists[index] has exceeded the deadline"""
+
+        if self.deadline is None or index not in self._started:
+            return False
+        return time.monotonic() - self._started[index] > self.deadline
+
+
+    def _wait_timeout(self, pending):
+        """Return how long to wait for the next completion"""
+
+        if self.deadline is None:
+            return None
+        timeout = self.poll_interval
+        for index in pending.values():
+            if index in self._started:
+                remaining = self._started[index] + self.deadline \
+                    - time.monotonic()
+                timeout = min(timeout, max(remaining, 0.0))
+        return timeout
+
+
+    def _share_samples(self):
+        """Copy the prepared samples into shared memory for process workers"""
+
+        from multiprocessing import shared_memory
+        self._shm = shared_memory.SharedMemory(
+            create=True, size=max(self.samples.nbytes, 1))
+        shared = np.ndarray(self.samples.shape,
+                            dtype=self.samples.dtype,
+                            buffer=self._shm.buf)
+        shared[...] = self.samples
+        del shared
+        # Unlinked even if the fits are dropped without being collected
+        self._finalizer = weakref.finalize(self, _free_shared_memory,
+                                           self._shm)
+
+
+    def _release(self):
+        """Free the shared memory and any executor created for these fits"""
+
+        if self._shm is not None:
+            self._finalizer()
+            self._shm = None
+        if self._owns_executor:
+            self.executor.shutdown(wait=False)
+
+
+def _free_shared_memory(shm):
+    """Close and unlink a shared memory segment"""
+
+    shm.close()
+    shm.unlink()
+
+
+# Attributes returned by a worker process: scalars only, never arrays of
+# (up to) the size of the samples
+_FIT_RESULTS = ('qmethod', 'slope', 'intercept', 'r2', 'shape', 'loc', 'scale')
+
+
+def _fit_shared_samples(dist_str, loc, qmethod_str, subsample, shm_name, n,
+                        dtype):
+    """Fit one candidate in a worker process; return the fitted parameters"""
+
+    from multiprocessing import shared_memory
+    from .distributions import SupportedDistributions
+
+    # Pool workers share the parent's resource tracker, so attaching does
+    # not take ownership of the segment; the parent unlinks it.
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        samples = np.ndarray((n,), dtype=dtype, buffer=shm.buf)
+        dist_obj = SupportedDistributions.create_subclass_instance(dist_str)
+        dist_obj.set_location(loc)
+        dist_obj.feed_samples(samples, presorted=True, subsample=subsample)
+        dist_obj.calc_quantiles(qmethod_str)
+        dist_obj.eval_data()
+        results = dict((key, dist_obj.__dict__[key]) for key in _FIT_RESULTS
+                       if key in dist_obj.__dict__)
+        del samples, dist_obj
+        return results
+    finally:
+        shm.close()
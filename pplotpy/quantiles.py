@@ -8,7 +8,12 @@
 #
 ################################################################################
 
-from numpy import zeros, array
+import os
+import tempfile
+import threading
+
+import numpy as np
+from scipy.special import betaincinv
 
 class Quantiles():
     """Parent class that registers subclasses, which calculate quantiles"""
@@ -39,6 +44,12 @@ class Quantiles():
         pass
 
 
+    def get_quantiles_at(self, n, ranks):
+        """Return quantile values of the 0-based order statistics 'ranks'"""
+
+        return self.get_quantiles(n)[ranks]
+
+
 @Quantiles.register_method("Filliben")
 class Filliben(Quantiles):
     """Calculate quantile values using Filliben's estimate"""
@@ -49,11 +60,14 @@ class Filliben(Quantiles):
 
     
     def get_quantiles(self, n):
-        quantiles = zeros(n)
-        quantiles[0] = 1.0 - ( 0.5**(1.0/n ) )
-        quantiles[-1] =0.5**(1.0/n)
-        quantiles[1:n] = [(ii + 1.0 - 0.3175) / (n + 0.365) for ii in range(1,n)]
-        return quantiles
+        return self.get_quantiles_at(n, np.arange(n))
+
+
+    def get_quantiles_at(self, n, ranks):
+        ranks = np.asarray(ranks)
+        return np.where(ranks == 0,
+                        1.0 - ( 0.5**(1.0/n) ),
+                        (ranks + 1.0 - 0.3175) / (n + 0.365))
 
 
 @Quantiles.register_method("i/(N+1)")
@@ -64,8 +78,11 @@ class NPlus1(Quantiles):
 
 
     def get_quantiles(self, n):
-        quantiles = array([(ii+1.0)/(n+1.0) for ii in range(n)])
-        return quantiles
+        return self.get_quantiles_at(n, np.arange(n))
+
+
+    def get_quantiles_at(self, n, ranks):
+        return (np.asarray(ranks) + 1.0) / (n + 1.0)
 
 
 @Quantiles.register_method("(i-0.5)/N")
@@ -75,8 +92,11 @@ class IMinusHalf(Quantiles):
     # http://www.itl.nist.gov/div898/handbook/apr/section2/apr221.htm
 
     def get_quantiles(self, n):
-        quantiles = array([(ii + 0.5)/n for ii in range(n)])
-        return quantiles
+        return self.get_quantiles_at(n, np.arange(n))
+
+
+    def get_quantiles_at(self, n, ranks):
+        return (np.asarray(ranks) + 0.5) / n
 
 
 @Quantiles.register_method("Median Rank")
@@ -86,5 +106,146 @@ class MedianRank(Quantiles):
     # http://www.itl.nist.gov/div898/handbook/apr/section2/apr221.htm
     # Probably equivalent to Filliben's, but with rounding
     def get_quantiles(self, n):
-        quantiles = array([(ii + 0.7)/(n+0.4) for ii in range(n)])
-        return quantiles
+        return self.get_quantiles_at(n, np.arange(n))
+
+
+    def get_quantiles_at(self, n, ranks):
+        return (np.asarray(ranks) + 0.7) / (n + 0.4)
+
+
+@Quantiles.register_method("Exact Median Rank")
+class ExactMedianRank(Quantiles):
+    """Serve exact median ranks from a precomputed, on-disk table"""
+
+    # The median rank of the i-th of n order statistics is the median of the
+    # beta distribution Beta(i, n - i + 1).  Evaluating the inverse incomplete
+    # beta function is expensive, so rows are computed in vectorized batches
+    # of 'batch_rows', cached in memory, and stored as a compressed *.npz
+    # table.  Row n of the table occupies flat indices [n(n-1)/2, n(n+1)/2),
+    # so the table grows as O(max_n^2): 4 MB for max_n = 1000, 100 MB (and
+    # several seconds to compute) for 5000.
+    #
+    # Above 'max_n' the approximation error of Filliben's estimate is
+    # negligible, so that method is used instead.
+
+    max_n = 1000      # Largest sample count served from the table
+    batch_rows = 64   # Rows generated per batch when extending the table
+    table_path = os.path.join(os.path.expanduser("~"),
+                              ".pplotpy",
+                              "median_ranks.npz")
+
+    _table = None     # Flat array of tabulated median ranks
+    _table_n = 0      # Number of rows currently tabulated
+    _lock = threading.Lock()
+
+
+    @classmethod
+    def configure(cls, max_n=None, table_path=None):
+        """Set the tabulation limit and/or location of the on-disk table"""
+
+        with cls._lock:
+            if max_n is not None:
+                cls.max_n = int(max_n)
+            if table_path is not None:
+                cls.table_path = table_path
+                cls._table, cls._table_n = None, 0
+
+
+    def get_quantiles(self, n):
+        if n > self.max_n:
+            return Filliben().get_quantiles(n)
+        table = self._get_table(n)
+        start = n * (n - 1) // 2
+        return table[start:start + n].copy()
+
+
+    def get_quantiles_at(self, n, ranks):
+        if n > self.max_n:
+            return Filliben().get_quantiles_at(n, ranks)
+        table = self._get_table(n)
+        return table[n * (n - 1) // 2 + np.asarray(ranks)]
+
+
+    @classmethod
+    def _get_table(cls, n):
+        """Return the flat table, extending it to at least n rows if needed"""
+
+        with cls._lock:
+            if cls._table is None:
+                cls._load_table()
+            if cls._table_n < n:
+                # Round up to a whole batch to limit recomputation/rewrites
+                n_new = -(-n // cls.batch_rows) * cls.batch_rows
+                cls._extend_table(min(max(n_new, n), cls.max_n))
+            return cls._table
+
+
+    @classmethod
+    def _load_table(cls):
+        """Read the stored table from disk, if one exists"""
+
+        cls._table, cls._table_n = np.empty(0), 0
+        try:
+            with np.load(cls.table_path) as stored:
+                table = stored["median_ranks"]
+                table_n = int(stored["n"])
+        except Exception:
+            # Missing, truncated or corrupt: recompute and rewrite it
+            return
+        if table.size == table_n * (table_n + 1) // 2:
+            cls._table, cls._table_n = table, table_n
+
+
+    @classmethod
+    def _extend_table(cls, n_new):
+        """Compute rows (_table_n, n_new] a batch at a time, and store"""
+
+        batches = [cls._table]
+        for first in range(cls._table_n + 1, n_new + 1, cls.batch_rows):
+            batches.append(
+                cls._calc_rows(first, min(first + cls.batch_rows, n_new + 1)))
+        cls._table = np.concatenate(batches)
+        cls._table_n = n_new
+        cls._save_table()
+
+
+    @staticmethod
+    def _calc_rows(first, stop):
+        """Return the rows first..stop-1 of the table, concatenated"""
+
+        # Only the lower half of each row is evaluated: by symmetry of the
+        # beta distribution, the median rank of i of n is 1 minus that of
+        # n - i + 1 of n.
+        rows = np.arange(first, stop)
+        half = (rows + 1) // 2
+        n = np.repeat(rows, half)
+        i = np.arange(n.size) - np.repeat(np.cumsum(half) - half, half) + 1
+        lower = betaincinv(i, n - i + 1.0, 0.5)
+
+        n = np.repeat(rows, rows)
+        i = np.arange(n.size) - np.repeat(np.cumsum(rows) - rows, rows) + 1
+        mirrored = i > (n + 1) // 2
+        index = np.repeat(np.cumsum(half) - half, rows) \
+            + np.where(mirrored, n - i, i - 1)
+        return np.where(mirrored, 1.0 - lower[index], lower[index])
+
+
+    @classmethod
+    def _save_table(cls):
+        """Write the table to disk; an unwritable location is not an error"""
+
+        # A unique temporary file, so that concurrent writers (e.g. worker
+        # processes) cannot interleave; os.replace() makes it visible whole.
+        tmp_path = None
+        try:
+            directory = os.path.dirname(cls.table_path)
+            os.makedirs(directory, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+            with os.fdopen(fd, "wb") as fileobj:
+                np.savez_compressed(fileobj,
+                                    median_ranks=cls._table,
+                                    n=cls._table_n)
+            os.replace(tmp_path, cls.table_path)
+        except OSError:
+            if tmp_path is not None and os.path.exists(tmp_path):
+                os.remove(tmp_path)
@@ -0,0 +1,324 @@
+###############################################################################
+#
+#    pplotpy - a probability plotting tool for Python
+#
+#    Copyright (C) 2017,  Nicholas A. Reynolds
+#
+#    Full License Available in LICENSE file at
+#    https://github.com/nicholasareynolds/pplotpy
+#
+###############################################################################
+
+import os
+import tempfile
+
+import numpy as np
+
+
+class SampleFormats():
+    """
+    Register and instantiate readers for the supported sample file formats.
+
+    Readers return a flat array of samples.  Binary formats are memory mapped
+    and returned as read-only views of the file, so no intermediate copy of
+    the samples is made before sorting.
+    """
+
+    subclasses = {}   # Empty container for formats to be registered at
+    extensions = {}   # File extension -> format label
+
+
+    # Decorator to store reader subclass, its label, and its file extensions
+    @classmethod
+    def register_format(cls, format_str, *extensions):
+        def decorator(subclass):
+            cls.subclasses[format_str] = subclass
+            for ext in extensions:
+                cls.extensions[ext] = format_str
+            return subclass
+        return decorator
+
+
+    # Instantiate a reader from its label
+    @classmethod
+    def create_subclass_instance(cls, format_str):
+        if format_str not in cls.subclasses:
+            raise ValueError("Invalid sample format: %s" % format_str)
+        return cls.subclasses[format_str]()
+
+
+    # Determine the format label from the extension of 'path'
+    @classmethod
+    def detect_format(cls, path):
+        ext = os.path.splitext(path)[1].lower()
+        if ext not in cls.extensions:
+            raise ValueError("Unrecognized sample file extension: %s" % ext)
+        return cls.extensions[ext]
+
+
+    def read(self, path, column=None):
+        """Return the samples stored in 'path' as a 1-D array"""
+
+        pass
+
+
+@SampleFormats.register_format("csv", ".csv")
+class CSVFormat(SampleFormats):
+    """Comma-separated values; all rows and columns are flattened"""
+
+    def read(self, path, column=None):
+        return np.loadtxt(path, delimiter=',', ndmin=1).ravel()
+
+
+@SampleFormats.register_format("npy", ".npy")
+class NpyFormat(SampleFormats):
+    """NumPy *.npy array, memory mapped and flattened"""
+
+    def read(self, path, column=None):
+        samples = np.load(path, mmap_mode='r')
+        if column is not None:
+            if samples.ndim != 2:
+                raise ValueError("A column can only be selected from a 2-D "
+                                 "array; %s is %d-D" % (path, samples.ndim))
+            if not -samples.shape[1] <= int(column) < samples.shape[1]:
+                raise ValueError("Column %s is out of range; %s has %d "
+                                 "columns" % (column, path, samples.shape[1]))
+            # A column is strided, so ravel() copies it
+            samples = samples[:, int(column)]
+        # Otherwise ravel() is a view for C-contiguous maps (the usual case)
+        return samples.ravel()
+
+
+@SampleFormats.register_format("float32", ".f32")
+class RawFloat32Format(SampleFormats):
+    """Headerless buffer of little-endian float32 values, memory mapped"""
+
+    dtype = '<f4'
+
+    def read(self, path, column=None):
+        size = os.path.getsize(path)
+        itemsize = np.dtype(self.dtype).itemsize
+        if size % itemsize:
+            raise ValueError("%s is %d bytes, not a whole number of %d-byte "
+                             "values" % (path, size, itemsize))
+        if size == 0:
+            return np.empty(0, dtype=self.dtype)
+        return np.memmap(path, dtype=self.dtype, mode='r')
+
+
+@SampleFormats.register_format("float64", ".f64", ".bin")
+class RawFloat64Format(RawFloat32Format):
+    """Headerless buffer of little-endian float64 values, memory mapped"""
+
+    dtype = '<f8'
+
+
+@SampleFormats.register_format("arrow", ".arrow", ".feather", ".ipc")
+class ArrowFormat(SampleFormats):
+    """Arrow IPC / Feather (v2) column, memory mapped (requires pyarrow)"""
+
+    # Only uncompressed files without nulls can be viewed without a copy;
+    # otherwise pyarrow materializes the column.
+
+    def read(self, path, column=None):
+        from pyarrow import feather
+        table = feather.read_table(path, memory_map=True)
+        if column is None:
+            column = 0
+        elif not isinstance(column, str) or column.isdigit():
+            column = int(column)
+        col = table.column(column)
+        if col.num_chunks == 1:
+            return col.chunk(0).to_numpy(zero_copy_only=False)
+        return col.to_numpy()
+
+
+def load_samples(path, fmt=None, column=None):
+    """Return samples in 'path' as a 1-D array; 'fmt' defaults to extension"""
+
+    if fmt is None:
+        fmt = SampleFormats.detect_format(path)
+    return SampleFormats.create_subclass_instance(fmt).read(path, column)
+
+
+def available_memory():
+    """Return the physical memory in bytes, or None if it cannot be found"""
+
+    try:
+        return os.sysconf('SC_PAGE_SIZE') * os.sysconf('SC_PHYS_PAGES')
+    except (AttributeError, ValueError, OSError):
+        return None
+
+
+def sort_samples(samples, out=None, chunk_size=None, scratch_dir=None):
+    """
+    Sort 'samples' into a single output buffer.
+
+    Without 'chunk_size', the samples are copied once into 'out' (allocated
+    if not given) and sorted in place.  With 'chunk_size', the sort is done
+    out-of-core: runs of 'chunk_size' samples are sorted and then merged
+    pairwise, so that at most a few chunks are resident at once.  In that
+    case 'out' defaults to a memory-mapped temporary file in 'scratch_dir'.
+    """
+
+    samples = np.asarray(samples).ravel()
+    n = samples.size
+    if chunk_size is None or chunk_size >= n:
+        if out is None:
+            out = np.empty(n, dtype=samples.dtype)
+        out[...] = samples
+        out.sort()
+        return out
+
+    chunk_size = int(chunk_size)
+    if out is None:
+        out = _scratch_buffer(n, samples.dtype, scratch_dir)
+
+    # Sort each run in its place in the output buffer
+    for start in range(0, n, chunk_size):
+        run = out[start:start + chunk_size]
+        run[...] = samples[start:start + chunk_size]
+        run.sort()
+
+    # Merge pairs of runs, alternating between 'out' and a scratch buffer
+    src, dst = out, _scratch_buffer(n, samples.dtype, scratch_dir)
+    width = chunk_size
+    while width < n:
+        for start in range(0, n, 2 * width):
+            mid, stop = min(start + width, n), min(start + 2 * width, n)
+            _merge_runs(src[start:mid], src[mid:stop], dst[start:stop],
+                        chunk_size)
+        src, dst = dst, src
+        width *= 2
+    if src is not out:
+        for start in range(0, n, chunk_size):
+            out[start:start + chunk_size] = src[start:start + chunk_size]
+    return out
+
+
+def load_sorted_samples(path, fmt=None, column=None, chunk_size=None,
+                        scratch_dir=None):
+    """
+    Load the samples in 'path' and return them sorted, ready for fitting.
+
+    If 'chunk_size' is not given and the samples exceed half of the physical
+    memory, an out-of-core sort with chunks of 1/16 of memory is used.
+    """
+
+    samples = load_samples(path, fmt, column)
+    if chunk_size is None:
+        memory = available_memory()
+        if memory is not None and samples.nbytes > memory // 2:
+            chunk_size = max(1, memory // (16 * samples.itemsize))
+    return sort_samples(samples, chunk_size=chunk_size,
+                        scratch_dir=scratch_dir)
+
+
+def stratified_ranks(n, m, tail=None):
+    """
+    Return ~'m' sorted, 0-based ranks spread evenly over 0..n-1.
+
+    The 'tail' lowest and highest ranks (default m/20 of each) are always
+    included so the extremes of the sample are represented exactly.
+    """
+
+    if m >= n:
+        return np.arange(n)
+    if tail is None:
+        tail = max(1, m // 20)
+    tail = min(tail, m // 2)
+    body = np.rint(np.linspace(0, n - 1, max(m - 2 * tail, 2))).astype(np.intp)
+    return np.unique(np.concatenate((np.arange(tail),
+                                     body,
+                                     np.arange(n - tail, n))))
+
+
+def rank_weights(ranks, n):
+    """Return the number of the n order statistics each of 'ranks' stands for"""
+
+    ranks = np.asarray(ranks, dtype=float)
+    bounds = np.concatenate(([-0.5], 0.5 * (ranks[1:] + ranks[:-1]), [n - 0.5]))
+    return np.diff(bounds)
+
+
+_SELECT_MAX_RANKS = 16   # Above this, partition_ranks() sorts instead
+
+
+def select_order_statistics(samples, ranks, presorted=False):
+    """Return the order statistics of 'samples' at the sorted 0-based 'ranks'"""
+
+    if presorted:
+        return np.asarray(samples).ravel()[ranks]
+    return partition_ranks(samples, ranks)[ranks]
+
+
+def partition_ranks(samples, ranks):
+    """
+    Return a copy of 'samples' with each of the sorted 0-based 'ranks'
+    holding its order statistic, as np.partition(samples, ranks) does.
+
+    The copy is partitioned at the middle rank, and each side is then
+    partitioned with only the ranks that fall in it, a single rank per pass
+    (np.partition with many ranks at once is far slower).  Each level of
+    this costs a pass over the samples, and a full sort about as much as
+    five, so with more than _SELECT_MAX_RANKS ranks the copy is sorted.
+    """
+
+    out = np.array(samples, copy=True).ravel()
+    ranks = np.asarray(ranks, dtype=np.intp)
+    if ranks.size > _SELECT_MAX_RANKS:
+        out.sort()
+        return out
+
+    # Segments out[lo:hi] holding ranks[i:j]; small or densely requested
+    # segments are sorted outright.
+    segments = [(0, out.size, 0, ranks.size)]
+    while segments:
+        lo, hi, i, j = segments.pop()
+        if i == j:
+            continue
+        if hi - lo <= max(8192, 8 * (j - i)):
+            out[lo:hi].sort()
+            continue
+        mid = (i + j) // 2
+        k = ranks[mid]
+        out[lo:hi].partition(k - lo)
+        segments.append((lo, k, i, mid))
+        segments.append((k + 1, hi, mid + 1, j))
+    return out
+
+
+def _scratch_buffer(n, dtype, scratch_dir=None):
+    """Return a writable memory map of 'n' values backed by a temporary file"""
+
+    if n == 0:
+        return np.empty(0, dtype=dtype)
+    with tempfile.TemporaryFile(dir=scratch_dir) as fileobj:
+        # The map keeps its own handle to the (already unlinked) file
+        return np.memmap(fileobj, dtype=dtype, mode='w+', shape=(n,))
+
+
+def _merge_runs(a, b, out, block):
+    """Merge sorted runs 'a' and 'b' into 'out', 'block' values at a time"""
+
+    i = j = k = 0
+    na, nb = a.size, b.size
+    while i < na and j < nb:
+        block_a, block_b = a[i:i + block], b[j:j + block]
+        # Everything up to the smaller block maximum can be emitted now; at
+        # least one of the two blocks is consumed completely.  np.sort and
+        # np.searchsorted both order NaN last, so the limit must as well.
+        limit = np.sort([block_a[-1], block_b[-1]])[0]
+        take_a = np.searchsorted(block_a, limit, side='right')
+        take_b = np.searchsorted(block_b, limit, side='right')
+        if take_a + take_b == 0:
+            raise RuntimeError("Merge of sorted runs failed to advance")
+        merged = np.concatenate((block_a[:take_a], block_b[:take_b]))
+        merged.sort(kind='stable')
+        out[k:k + merged.size] = merged
+        i, j, k = i + take_a, j + take_b, k + merged.size
+    for rest, pos in ((a, i), (b, j)):
+        for start in range(pos, rest.size, block):
+            chunk = rest[start:start + block]
+            out[k:k + chunk.size] = chunk
+            k += chunk.size